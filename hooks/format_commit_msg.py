@@ -1,27 +1,65 @@
 """Format commit message according to branch name."""
 
-import argparse
-import re
+import functools
+import logging
+import os
+import sys
 from typing import Sequence, Union
 
-import git
-
-DEFAULT_COMMIT_TYPES = [
-    "fix",
-    "feat",
-    "build",
-    "chore",
-    "ci",
-    "docs",
-    "style",
-    "refactor",
-    "perf",
-    "test",
-]
-DEFAULT_SKIP_PREFIXES = ["skip", "no-verify", "s"]
+DEFAULT_COMMIT_TYPES = frozenset(
+    {
+        "fix",
+        "feat",
+        "build",
+        "chore",
+        "ci",
+        "docs",
+        "style",
+        "refactor",
+        "perf",
+        "test",
+    }
+)
+DEFAULT_SKIP_PREFIXES = frozenset({"skip", "no-verify", "s"})
 # DEFAULT_BRANCH_FORMAT = "{commit_type}/{issue_no}/*"
 # DEFAULT_COMMIT_FORMAT = ""
 
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=1)
+def _current_branch() -> str:
+    """Return the name of the currently checked out branch.
+
+    Reads ``HEAD`` from ``$GIT_DIR`` (default ``.git``) directly and only falls
+    back to GitPython if HEAD is detached or the file is not in the expected
+    shape.
+    """
+    ref_prefix = "ref: refs/heads/"
+    head_fp = os.path.join(os.environ.get("GIT_DIR", ".git"), "HEAD")
+    try:
+        with open(head_fp, "r", encoding="utf-8") as f:
+            head = f.read().strip()
+    except OSError:
+        head = ""
+    if head.startswith(ref_prefix):
+        return head[len(ref_prefix) :]
+
+    # GitPython is slow to import so only pay for it when actually needed
+    import git
+
+    return git.Repo().active_branch.name
+
+
+def _is_ascii_alpha(s: str) -> bool:
+    """Equivalent to matching ``^[A-Za-z]+$``."""
+    return s.isascii() and s.isalpha()
+
+
+def _is_ascii_digit(s: str) -> bool:
+    """Equivalent to matching ``^[0-9]+$``."""
+    return s.isascii() and s.isdigit()
+
 
 class Commit:
 
@@ -35,6 +73,10 @@ class Commit:
         self.updated_commit_message = None
         self._commit_types = DEFAULT_COMMIT_TYPES
         self._skip_prefixes = DEFAULT_SKIP_PREFIXES
+        self._allowed_types = self._commit_types | self._skip_prefixes
+        self._skip_prefix_hint = (
+            "{" + ", ".join(sorted(repr(s + ":") for s in self._skip_prefixes)) + "}"
+        )
         self.branch_name = branch_name
         self.skipped = False
 
@@ -43,10 +85,15 @@ class Commit:
 
     def format_message(self):
         """Format the commit message where applicable."""
-        self._read_commit_message()
-        self._extract_type_from_commit_message()
-        self._format_commit_message()
-        self._write_commit_message()
+        # Read and rewrite through a single binary file descriptor; the message
+        # is tiny so decoding it in one go is cheaper than text-mode I/O
+        with open(self.message_fp, "rb+") as f:
+            self.commit_message = f.read().decode("utf-8")
+            self._extract_type_from_commit_message()
+            self._format_commit_message()
+            f.seek(0)
+            f.write(self.updated_commit_message.encode("utf-8"))
+            f.truncate()
 
     def _set_branch_info(self):
         """Set the default commit type and issue number (if any) described by
@@ -59,38 +106,44 @@ class Commit:
             If default commit type is found but Jira issue no is not found.
         """
         if not self.branch_name:
-            repo = git.Repo()
-            self.branch_name = repo.active_branch.name
-        branch_name_parts = self.branch_name.split("/")
-
-        if branch_name_parts[0].lower() not in self._commit_types:
+            self.branch_name = _current_branch()
+        # Only the first two segments matter e.g. "feat/PROJ-123/my_feat"
+        branch_type, _, rest = self.branch_name.partition("/")
+        default_commit_type = branch_type.lower()
+        if default_commit_type not in self._commit_types:
             return
 
-        default_commit_type = branch_name_parts[0].lower()
         # Check for a match e.g. "PROJ-123"
-        match = re.search(r"^[A-Za-z]+-[0-9]+$", branch_name_parts[1])
-        if not match:
+        issue_no = rest.partition("/")[0]
+        proj, dash, num = issue_no.partition("-")
+        if not (dash and _is_ascii_alpha(proj) and _is_ascii_digit(num)):
             err = "Branch name contains a type but no jira issue no."
             raise ValueError(err)
 
         self.default_commit_type = default_commit_type
-        self.issue_no = match[0]
+        self.issue_no = issue_no.upper()
         return
 
-    def _read_commit_message(self):
-        with open(self.message_fp, "r", encoding="utf-8") as f:
-            self.commit_message = f.read()
-
-    def _write_commit_message(self):
-        with open(self.message_fp, "w", encoding="utf-8") as f:
-            f.write(self.updated_commit_message)
-
     def _extract_type_from_commit_message(self):
         """Extract the commit type from the commit message. Remove the commit
-        type from the commit message.
+        type from the commit message. Mark the commit as skipped if the type is
+        a skip prefix.
         """
 
-        match = re.search(r"^[A-Za-z]+(?=:)", self.commit_message)
+        # Check for a match e.g. "feat" in "feat: my message". Use find rather
+        # than partition, which also copied everything after the first ":"
+        colon = self.commit_message.find(":")
+        match = None
+        if colon != -1:
+            prefix = self.commit_message[:colon]
+            # Skip prefixes are case-sensitive, so compare before lower-casing
+            if prefix in self._skip_prefixes:
+                self.commit_type = prefix
+                # +1 for the ":"
+                self.commit_message = self.commit_message[colon + 1 :].strip()
+                self.skipped = True
+                return
+            match = prefix if _is_ascii_alpha(prefix) else None
 
         if match is None:
             if self.default_commit_type is None:
@@ -99,7 +152,7 @@ class Commit:
                     f"name '{self.branch_name}' or the commit message "
                     f"'{self.commit_message.strip()}'. Start the commit "
                     "message with one of "
-                    f"{ {s+':' for s in self._skip_prefixes} } to skip this "
+                    f"{self._skip_prefix_hint} to skip this "
                     "check."
                 )
                 raise ValueError(err)
@@ -107,45 +160,40 @@ class Commit:
             # Leave commit message unchanged
             return
 
-        if match[0].lower() in self._skip_prefixes + self._commit_types:
-            self.commit_type = match[0]
+        commit_type = match.lower()
+        if commit_type in self._allowed_types:
+            self.commit_type = commit_type
             # +1 for the ":"
-            self.commit_message = self.commit_message[
-                len(self.commit_type) + 1 :
-            ].strip()
+            self.commit_message = self.commit_message[colon + 1 :].strip()
             return
 
         err = (
-            f"Commit type '{match[0].lower()}' is not allowed according to "
+            f"Commit type '{commit_type}' is not allowed according to "
             "conventional commit."
         )
         raise ValueError(err)
 
     def _format_commit_message(self):
-        if self.commit_type in self._skip_prefixes:
+        if self.skipped:
             # No further changes. (The skip prefix was already extracted)
             self.updated_commit_message = self.commit_message
             return
 
         if (self.commit_type is None) or (self.issue_no is None):
             raise ValueError("Either commit_type of issue_no could not be determined.")
-        print(
-            f"Extracted commit_type: '{self.commit_type}' and "
-            f"issue_no: '{self.issue_no}'."
+        logger.debug(
+            "Extracted commit_type: '%s' and issue_no: '%s'.",
+            self.commit_type,
+            self.issue_no,
         )
         self.updated_commit_message = (
-            f"{self.issue_no.upper()}"
-            f"({self.commit_type.lower()}): "
-            f"{self.commit_message}"
+            f"{self.issue_no}({self.commit_type}): {self.commit_message}"
         )
 
 
 def main(input_args: Sequence[str] | None = None) -> int:
     """Entry point to the hook."""
-    parser = argparse.ArgumentParser()
-    parser.add_argument("args", nargs="*")
-    namespace = parser.parse_args(input_args)
-    parsed_args = namespace.args
+    parsed_args = list(input_args) if input_args is not None else sys.argv[1:]
     try:
         Commit(message_fp=parsed_args[0]).format_message()
         return 0
@@ -1,10 +1,8 @@
-import os
 from contextlib import nullcontext
-from tempfile import NamedTemporaryFile
 
 import pytest
 
-from hooks.format_commit_msg import Commit
+from hooks.format_commit_msg import Commit, _current_branch
 
 param_options = (
     (
@@ -36,6 +34,30 @@ param_options = (
             "feat",
             "ABC-789",
         ),
+        (
+            "feat/abc-123/my_feat",
+            "Fix: my message here",
+            nullcontext("ABC-123(fix): my message here"),
+            "feat",
+            "fix",
+            "ABC-123",
+        ),
+        (
+            "feat/ABC-1/x",
+            "Skip: my msg",
+            nullcontext("ABC-1(skip): my msg"),
+            "feat",
+            "skip",
+            "ABC-1",
+        ),  # skip prefixes are case-sensitive
+        (
+            "develop",
+            "S: my msg",
+            pytest.raises(ValueError, match="issue_no could not be determined"),
+            "",
+            "",
+            "",
+        ),  # skip prefixes are case-sensitive
         # Empty string because None is a valid value
         (
             "fix/my_fix",
@@ -45,10 +67,24 @@ param_options = (
             "",
             "",
         ),  # branch contains commit type but not issue no
+        (
+            "fix",
+            "chore: my message here",
+            pytest.raises(ValueError, match="no jira issue"),
+            "",
+            "",
+            "",
+        ),  # branch is only a commit type
         (
             "develop",
             "my message",
-            pytest.raises(ValueError, match="type could not be determined"),
+            pytest.raises(
+                ValueError,
+                match=(
+                    r"type could not be determined.*"
+                    r"\{'no-verify:', 's:', 'skip:'\} to skip"
+                ),
+            ),
             "",
             "",
             "",
@@ -69,7 +105,15 @@ param_options = (
             "",
             "",
         ),  # neither commit type nor issue number in branch name
-        ("develop", "skip: my message", nullcontext("my message"), None, None, None),
+        ("develop", "skip: my message", nullcontext("my message"), None, "skip", None),
+        (
+            "develop",
+            "no-verify: my message",
+            nullcontext("my message"),
+            None,
+            "no-verify",
+            None,
+        ),
     ],
 )
 
@@ -82,21 +126,64 @@ def test_one(
     exp_default_commit_type,
     exp_commit_type,
     exp_issue_no,
+    tmp_path,
 ):
-    tmp_file = NamedTemporaryFile(delete=False)
+    message_fp = tmp_path / "COMMIT_EDITMSG"
+    message_fp.write_text(commit_msg, encoding="utf-8")
+
+    with exp_commit_msg as exp:  # exp = the value of `nullcontext(value)`
+        commit = Commit(message_fp=message_fp, branch_name=branch_name)
+        commit.format_message()
+        assert commit.updated_commit_message == exp
+        assert commit.default_commit_type == exp_default_commit_type
+        assert commit.commit_type == exp_commit_type
+        assert commit.issue_no == exp_issue_no
+
+
+def test_format_message_writes_file(tmp_path):
+    message_fp = tmp_path / "COMMIT_EDITMSG"
+    message_fp.write_text("fix: my message here", encoding="utf-8")
+
+    Commit(message_fp=message_fp, branch_name="feat/ABC-123/my_feat").format_message()
+    assert message_fp.read_text(encoding="utf-8") == "ABC-123(fix): my message here"
+
+
+@pytest.mark.parametrize("git_dir_name", [None, "custom.git"])
+def test_current_branch_reads_git_head(tmp_path, monkeypatch, git_dir_name):
+    git_dir = tmp_path / (git_dir_name or ".git")
+    git_dir.mkdir()
+    (git_dir / "HEAD").write_text("ref: refs/heads/feat/ABC-123/my_feat\n")
+    monkeypatch.chdir(tmp_path)
+    if git_dir_name:
+        monkeypatch.setenv("GIT_DIR", git_dir_name)
+    else:
+        monkeypatch.delenv("GIT_DIR", raising=False)
+    _current_branch.cache_clear()
+    try:
+        assert _current_branch() == "feat/ABC-123/my_feat"
+    finally:
+        _current_branch.cache_clear()
+
+
+@pytest.mark.parametrize(
+    "head", ["0123456789abcdef0123456789abcdef01234567\n", None]
+)  # detached HEAD, unreadable HEAD
+def test_current_branch_falls_back_to_gitpython(tmp_path, monkeypatch, head):
+    git = pytest.importorskip("git")
 
-    with open(tmp_file.name, mode="w", encoding="utf-8") as f:
-        f.write(commit_msg)
+    class FakeRepo:
+        class active_branch:
+            name = "fix/ABC-456/my_fix"
 
+    git_dir = tmp_path / ".git"
+    git_dir.mkdir()
+    if head is not None:
+        (git_dir / "HEAD").write_text(head)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    monkeypatch.setattr(git, "Repo", FakeRepo)
+    _current_branch.cache_clear()
     try:
-        with exp_commit_msg as exp:  # exp = the value of `nullcontext(value)`
-            commit = Commit(message_fp=tmp_file.name, branch_name=branch_name)
-            commit.format_message()
-            with open(tmp_file.name, mode="r", encoding="utf-8") as f:
-                # This value is the same as commit.commit_message
-                updated_msg = f.read()
-            assert updated_msg == exp
-            assert commit.default_commit_type == exp_default_commit_type
-            assert commit.issue_no == exp_issue_no
+        assert _current_branch() == "fix/ABC-456/my_fix"
     finally:
-        os.remove(tmp_file.name)
+        _current_branch.cache_clear()